@@ -0,0 +1,52 @@
+import argparse
+import time
+
+import homework
+import metrics
+from exceptions import BotError
+
+RESULT = '{:<32}{:>10.3f} с.'
+NOTIFICATION = 'Проверка задержки уведомлений.'
+
+
+def poll():
+    """Время одного запроса к API Яндекс практикума."""
+    started = time.monotonic()
+    try:
+        homework.request_api({'from_date': int(time.time())})
+    except BotError:
+        pass
+    return time.monotonic() - started
+
+
+def main():
+    """Сравнивает задержку опроса без прогрева, с прогревом и после простоя.
+
+    Отправляет в чат TELEGRAM_CHAT_ID одно проверочное уведомление.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        '--idle', type=float, default=homework.KEEPALIVE_TIMEOUT * 2,
+        help='длительность простоя перед последним запросом, с.')
+    args = parser.parse_args()
+    results = {'cold_poll': poll(), 'cold_poll_repeat': poll()}
+    bot = homework.make_bot()
+    warmer = homework.warm_up(bot)
+    results['warm_up_time'] = metrics.VALUES['warm_up_time']
+    results['warm_poll'] = poll()
+    results['startup_to_warm_poll'] = time.monotonic() - homework.STARTED
+    try:
+        homework.send_message(bot, NOTIFICATION)
+    except BotError:
+        pass
+    if 'startup_to_first_notification' in metrics.VALUES:
+        results['startup_to_first_notification'] = metrics.VALUES[
+            'startup_to_first_notification']
+    warmer.wait(args.idle, metrics.VALUES.get('last_poll'))
+    results['idle_poll'] = poll()
+    for name, value in results.items():
+        print(RESULT.format(name, value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import metrics
+from exceptions import CircuitOpen, QuotaExceeded
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+CIRCUIT_OPEN = 'Запросы к {} приостановлены до {:.0f} с. после сбоев.'
+
+
+class CircuitBreaker:
+    """Прекращает обращения к недоступному сервису.
+
+    После `failure_threshold` сбоев подряд цепь размыкается, и вызовы
+    сразу завершаются исключением `CircuitOpen`. Через `recovery_time`
+    секунд цепь переходит в полуоткрытое состояние и пропускает не более
+    `probes` пробных вызовов: успешный вызов замыкает цепь, сбой снова
+    ее размыкает. Сбоем считаются только исключения из `failures`.
+    Исключения из `ignored` означают, что запрос не дошел до сервиса,
+    и не меняют состояние цепи. Время отсчитывается функцией `clock`.
+    """
+
+    def __init__(self, name, failures, failure_threshold=5,
+                 recovery_time=60, probes=1,
+                 ignored=(QuotaExceeded, CircuitOpen), clock=time.monotonic):
+        self.name = name
+        self.failures = failures
+        self.ignored = ignored
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.probes = probes
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at = 0
+        self.probes_in_flight = 0
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def register_metrics(self):
+        """Публикует состояние цепи в метриках."""
+        metrics.gauge(f'breaker_{self.name}_state', lambda: self.state)
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.recovery_time:
+                    self._reject()
+                self.state = HALF_OPEN
+                self.probes_in_flight = 0
+            if self.state == HALF_OPEN:
+                if self.probes_in_flight >= self.probes:
+                    self._reject()
+                self.probes_in_flight += 1
+
+    def _reject(self):
+        metrics.increment(f'breaker_{self.name}_rejected')
+        raise CircuitOpen(CIRCUIT_OPEN.format(
+            self.name,
+            self.opened_at + self.recovery_time - self.clock()))
+
+    def _on_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failure_count = 0
+
+    def _on_ignored(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probes_in_flight -= 1
+
+    def _on_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            if (self.state == HALF_OPEN
+                    or self.failure_count >= self.failure_threshold):
+                if self.state != OPEN:
+                    metrics.increment(f'breaker_{self.name}_opened')
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+    def call(self, func, *args):
+        """Вызывает функцию, если цепь не разомкнута."""
+        self._before_call()
+        try:
+            result = func(*args)
+        except self.ignored:
+            self._on_ignored()
+            raise
+        except self.failures:
+            self._on_failure()
+            raise
+        except Exception:
+            self._on_success()
+            raise
+        self._on_success()
+        return result
@@ -0,0 +1,169 @@
+import json
+import re
+import time
+
+from requests import RequestException
+
+from exceptions import ReplayMismatch
+
+RECORDED_HEADERS = ('Retry-After', 'Content-Type')
+OAUTH_PATTERN = re.compile(r'OAuth [^\s\'"]+')
+HIDDEN = '***'
+PARAMS_MISMATCH = ('Запрос №{} отправлен с параметрами {}, '
+                   'а в записи параметры {}.')
+CASSETTE_EXHAUSTED = 'Бот сделал больше запросов, чем есть в записи: {}.'
+REQUESTS_LEFT = 'Бот сделал {} запросов из {} записанных.'
+NO_CYCLES = 'В записи нет ни одного цикла опроса.'
+NOTIFICATIONS_MISMATCH = ('Отправленные уведомления не совпадают с записью.'
+                          'Ожидалось: {}. Получено: {}.')
+
+
+def sanitize(value, secrets=()):
+    """Заменяет токены и авторизационные заголовки в данных."""
+    if isinstance(value, str):
+        for secret in secrets:
+            if secret:
+                value = value.replace(str(secret), HIDDEN)
+        return OAUTH_PATTERN.sub(f'OAuth {HIDDEN}', value)
+    if isinstance(value, dict):
+        return {key: sanitize(item, secrets) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(item, secrets) for item in value]
+    return value
+
+
+def load(path):
+    """Читает записанный трафик из файла."""
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class Cassette:
+    """Записывает обезличенные запросы к API и уведомления в файл."""
+
+    def __init__(self, path, secrets=()):
+        self.path = path
+        self.secrets = secrets
+        self.started = time.monotonic()
+
+    def record(self, kind, **data):
+        """Добавляет запись в конец файла."""
+        entry = {
+            'kind': kind,
+            'time': round(time.monotonic() - self.started, 3),
+            **sanitize(data, self.secrets),
+        }
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def record_cycle(self, current_timestamp):
+        """Отмечает начало цикла опроса."""
+        self.record('cycle', from_date=current_timestamp)
+
+    def record_response(self, params, response):
+        """Записывает ответ API Яндекс практикума."""
+        headers = {
+            name: response.headers[name]
+            for name in RECORDED_HEADERS if name in response.headers
+        }
+        self.record('practicum', params=params, status=response.status_code,
+                    headers=headers, text=response.text)
+
+    def record_error(self, params, error):
+        """Записывает ошибку соединения с API Яндекс практикума."""
+        self.record('practicum', params=params, error=str(error))
+
+    def record_message(self, text):
+        """Записывает отправленное уведомление."""
+        self.record('telegram', text=text)
+
+
+class ReplayResponse:
+    """Ответ API, восстановленный из записи."""
+
+    def __init__(self, status, headers, text):
+        self.status_code = status
+        self.headers = headers
+        self.text = text
+
+    def json(self):
+        """Разбирает тело ответа как JSON."""
+        return json.loads(self.text)
+
+
+class Player:
+    """Воспроизводит записанный трафик вместо API и бота Telegram.
+
+    Метод `get` подменяет `requests.get`, метод `send_message` подменяет
+    бота. Циклы опроса воспроизводятся в записанные моменты времени по
+    часам `clock`, которые также сдвигаются паузами `sleep`. Скорость
+    `speed` ускоряет реальные паузы, при нуле циклы идут без пауз.
+    """
+
+    def __init__(self, entries, speed=0, secrets=()):
+        self.requests = [e for e in entries if e['kind'] == 'practicum']
+        self.expected = [e['text'] for e in entries if e['kind'] == 'telegram']
+        self.starts = [e for e in entries if e['kind'] == 'cycle']
+        self.moments = [entry['time'] for entry in self.starts]
+        self.speed = speed
+        self.secrets = secrets
+        self.sent = []
+        self.mismatches = []
+        self.position = 0
+        self.now = 0
+
+    def pending(self):
+        """В записи остались невоспроизведенные запросы."""
+        return self.position < len(self.requests)
+
+    def cycles(self):
+        """Перебирает записанные циклы, переводя часы на их начало."""
+        for moment in self.moments:
+            if self.speed:
+                time.sleep(max(0, moment - self.now) / self.speed)
+            self.now = moment
+            yield moment
+
+    def clock(self):
+        """Время записи, до которого дошло воспроизведение."""
+        return self.now
+
+    def sleep(self, delay):
+        """Пауза между повторами запроса с учетом скорости воспроизведения."""
+        self.now += delay
+        if self.speed:
+            time.sleep(delay / self.speed)
+
+    def first_timestamp(self):
+        """Метка времени, с которой начиналась запись."""
+        if not self.starts:
+            raise ReplayMismatch(NO_CYCLES)
+        return self.starts[0]['from_date']
+
+    def get(self, url, params=None, **kwargs):
+        """Возвращает следующий записанный ответ API."""
+        if not self.pending():
+            raise ReplayMismatch(CASSETTE_EXHAUSTED.format(len(self.requests)))
+        entry = self.requests[self.position]
+        self.position += 1
+        if params != entry['params']:
+            self.mismatches.append(PARAMS_MISMATCH.format(
+                self.position, params, entry['params']))
+        if 'error' in entry:
+            raise RequestException(entry['error'])
+        return ReplayResponse(entry['status'], entry['headers'], entry['text'])
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Запоминает уведомление вместо отправки."""
+        self.sent.append(sanitize(text, self.secrets))
+
+    def verify(self):
+        """Проверяет, что запросы и уведомления совпали с записанными."""
+        if self.pending():
+            self.mismatches.append(REQUESTS_LEFT.format(
+                self.position, len(self.requests)))
+        if self.sent != self.expected:
+            self.mismatches.append(
+                NOTIFICATIONS_MISMATCH.format(self.expected, self.sent))
+        if self.mismatches:
+            raise ReplayMismatch(' '.join(self.mismatches))
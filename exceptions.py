@@ -1,10 +1,114 @@
-class UnexpectedStatusCode(Exception):
+RETRY_BACKOFF = 'backoff'
+RETRY_AFTER = 'retry_after'
+DISABLE = 'disable'
+NEXT_CYCLE = 'next_cycle'
+
+
+class BotError(Exception):
+    """Ошибка при работе с API Яндекс практикума или Telegram.
+
+    Атрибут `retry_policy` определяет, как бот реагирует на ошибку:
+    повторяет запрос с нарастающей паузой, ждет время из Retry-After,
+    отключает опрос или откладывает запрос до следующего цикла.
+    """
+
+    retry_policy = NEXT_CYCLE
+
+
+class TransientNetworkError(BotError, ConnectionError):
+    """Временная ошибка соединения с сервером."""
+
+    retry_policy = RETRY_BACKOFF
+
+
+class UnexpectedStatusCode(BotError):
     """Сервер вернул статус-код который мы не ожидали."""
 
     pass
 
 
+class ServerError(UnexpectedStatusCode):
+    """Сервер временно не может обработать запрос."""
+
+    retry_policy = RETRY_BACKOFF
+
+
+class RateLimited(UnexpectedStatusCode):
+    """Сервер ограничил частоту запросов."""
+
+    retry_policy = RETRY_AFTER
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AuthError(UnexpectedStatusCode):
+    """Сервер отклонил токен."""
+
+    retry_policy = DISABLE
+
+
+class TelegramAuthError(BotError):
+    """Telegram отклонил токен бота.
+
+    Опрос API не отключается: токен Яндекс практикума действителен,
+    а уведомления будут отправлены, когда токен бота исправят.
+    """
+
+    pass
+
+
+class SchemaError(BotError):
+    """Ответ сервера не соответствует ожидаемой схеме."""
+
+    pass
+
+
+class MissingKey(SchemaError, KeyError):
+    """В ответе сервера нет обязательного ключа."""
+
+    def __str__(self):
+        return Exception.__str__(self)
+
+
+class WrongType(SchemaError, TypeError):
+    """Значение в ответе сервера имеет неожиданный тип."""
+
+    pass
+
+
+class ApiErrorResponse(SchemaError, ValueError):
+    """Сервер вернул описание ошибки вместо данных."""
+
+    pass
+
+
+class UnknownStatus(SchemaError, ValueError):
+    """Сервер вернул недокументированный статус домашней работы."""
+
+    pass
+
+
+class CircuitOpen(BotError):
+    """Запросы к сервису приостановлены после серии сбоев."""
+
+    pass
+
+
+class QuotaExceeded(BotError):
+    """Лимит запросов к API исчерпан."""
+
+    pass
+
+
 class EmptyList(Exception):
     """Сервер вернул пустой список."""
 
     pass
+
+
+class ReplayMismatch(Exception):
+    """Воспроизведенный трафик не совпал с записью."""
+
+    pass
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Hedger:
+    """Дублирует медленный запрос и возвращает первый полученный ответ.
+
+    Если запрос не ответил за время квантиля `quantile` последних задержек,
+    отправляется второй такой же запрос. Доля продублированных запросов
+    не превышает `max_share` от всего трафика, а функция `admit`, если
+    задана, может запретить дублирование, например при исчерпанном лимите.
+    """
+
+    def __init__(self, enabled=False, quantile=0.95, max_share=0.1,
+                 window=100, min_samples=20, max_workers=4):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.max_share = max_share
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def delay(self):
+        """Задержка, после которой запрос дублируется, или None."""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.quantile))
+        return ordered[index]
+
+    def _may_hedge(self, admit):
+        with self._lock:
+            if self.hedges + 1 > self.requests * self.max_share:
+                return False
+            if admit is not None and not admit():
+                return False
+            self.hedges += 1
+            return True
+
+    def _record(self, started):
+        with self._lock:
+            self.latencies.append(time.monotonic() - started)
+
+    def call(self, func, admit=None):
+        """Выполняет `func` с дублированием по правилам политики."""
+        with self._lock:
+            self.requests += 1
+        started = time.monotonic()
+        delay = self.delay() if self.enabled else None
+        if delay is None:
+            result = func()
+            self._record(started)
+            return result
+        futures = [self._executor.submit(func)]
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._may_hedge(admit):
+            futures.append(self._executor.submit(func))
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._record(started)
+                    return future.result()
+        return futures[0].result()
@@ -0,0 +1,171 @@
+import argparse
+import math
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS transitions (
+    tenant TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    status TEXT NOT NULL,
+    changed_at INTEGER NOT NULL,
+    PRIMARY KEY (tenant, homework, status, changed_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transitions_by_status_time
+    ON transitions (status, changed_at);
+CREATE INDEX IF NOT EXISTS transitions_by_tenant_time
+    ON transitions (tenant, changed_at);
+CREATE TABLE IF NOT EXISTS latest (
+    tenant TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    status TEXT NOT NULL,
+    changed_at INTEGER NOT NULL,
+    PRIMARY KEY (tenant, homework)
+) WITHOUT ROWID;
+'''
+INSERT_TRANSITION = '''
+INSERT OR IGNORE INTO transitions (tenant, homework, status, changed_at)
+VALUES (?, ?, ?, ?)
+'''
+UPSERT_LATEST = '''
+INSERT INTO latest (tenant, homework, status, changed_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (tenant, homework) DO UPDATE
+SET status = excluded.status, changed_at = excluded.changed_at
+WHERE excluded.changed_at >= latest.changed_at
+'''
+TURNAROUND = '''
+SELECT finish.changed_at - (
+    SELECT MIN(start.changed_at) FROM transitions AS start
+    WHERE start.tenant = finish.tenant
+        AND start.homework = finish.homework
+        AND start.status = :start
+        AND start.changed_at <= finish.changed_at
+)
+FROM transitions AS finish
+WHERE finish.status = :finish
+    AND finish.changed_at >= :since AND finish.changed_at < :until
+    AND (:tenant IS NULL OR finish.tenant = :tenant)
+'''
+BACKLOG = '''
+SELECT status, COUNT(*) FROM latest
+WHERE :tenant IS NULL OR tenant = :tenant
+GROUP BY status
+'''
+PERCENTILES = (50, 90, 95, 99)
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+
+
+def parse_date(value):
+    """Переводит дату из ответа API в метку времени или возвращает None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return int(datetime.strptime(
+            value.replace('Z', '+0000'), DATE_FORMAT).timestamp())
+    except ValueError:
+        return None
+
+
+def percentile(ordered, rank):
+    """Значение перцентиля `rank` в отсортированном списке."""
+    index = max(0, math.ceil(len(ordered) * rank / 100) - 1)
+    return ordered[index]
+
+
+class History:
+    """Локальное хранилище смен статусов домашних работ.
+
+    Каждая наблюдаемая смена статуса добавляется в таблицу `transitions`
+    с индексами по токену, работе, статусу и времени, а таблица `latest`
+    хранит последний статус каждой работы для подсчета очереди.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def append(self, tenant, homeworks, observed_at=None):
+        """Добавляет статусы работ из ответа API."""
+        observed_at = int(observed_at or time.time())
+        rows = [
+            (tenant, homework['homework_name'], homework['status'],
+             parse_date(homework.get('date_updated')) or observed_at)
+            for homework in homeworks
+        ]
+        with self.connection:
+            self.connection.executemany(INSERT_TRANSITION, rows)
+            self.connection.executemany(UPSERT_LATEST, rows)
+
+    def turnaround(self, since, until=None, start='reviewing',
+                   finish='approved', tenant=None, percentiles=PERCENTILES):
+        """Перцентили времени от статуса `start` до статуса `finish`.
+
+        Учитываются работы, получившие статус `finish` в интервале
+        [since, until).
+        """
+        durations = sorted(
+            duration for duration, in self.connection.execute(TURNAROUND, {
+                'start': start, 'finish': finish, 'since': since,
+                'until': until or math.inf, 'tenant': tenant,
+            })
+            if duration is not None
+        )
+        result = {'count': len(durations)}
+        for rank in percentiles:
+            result[f'p{rank}'] = (
+                percentile(durations, rank) if durations else None)
+        return result
+
+    def backlog(self, tenant=None):
+        """Количество работ по их текущему статусу."""
+        return dict(self.connection.execute(BACKLOG, {'tenant': tenant}))
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+
+DURATION = '{:<8}{:>12}'
+
+
+def format_duration(seconds):
+    """Длительность в виде часов и минут."""
+    if seconds is None:
+        return '-'
+    hours, seconds = divmod(int(seconds), 3600)
+    return f'{hours}ч {seconds // 60:02d}м'
+
+
+def main():
+    """Выводит статистику проверки работ."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        '--db', default=os.getenv('HISTORY_PATH', 'homework.history.sqlite3'),
+        help='файл хранилища истории')
+    parser.add_argument('--tenant', help='идентификатор токена')
+    commands = parser.add_subparsers(dest='command', required=True)
+    turnaround = commands.add_parser(
+        'turnaround', help='время от взятия на проверку до результата')
+    turnaround.add_argument('--days', type=float, default=7)
+    turnaround.add_argument('--start', default='reviewing')
+    turnaround.add_argument('--finish', default='approved')
+    commands.add_parser('backlog', help='количество работ по статусам')
+    args = parser.parse_args()
+    history = History(args.db)
+    if args.command == 'turnaround':
+        result = history.turnaround(
+            time.time() - args.days * 86400, start=args.start,
+            finish=args.finish, tenant=args.tenant)
+        print(DURATION.format('count', result.pop('count')))
+        for name, value in result.items():
+            print(DURATION.format(name, format_duration(value)))
+    else:
+        for status, count in sorted(history.backlog(args.tenant).items()):
+            print(DURATION.format(status, count))
+    history.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,15 @@
+import argparse
+import hashlib
+import json
 import logging
 import logging.handlers
 import os
+import random
+import sqlite3
+import sys
 import time
+from email.utils import parsedate_to_datetime
+from functools import partial
 from http import HTTPStatus
 
 import requests
@@ -9,20 +17,47 @@ import telegram
 from dotenv import load_dotenv
 from requests import RequestException
 
-from exceptions import UnexpectedStatusCode
+import cassette
+import metrics
+from breaker import CLOSED, OPEN, CircuitBreaker
+from exceptions import (DISABLE, RETRY_AFTER, RETRY_BACKOFF, ApiErrorResponse,
+                        AuthError, BotError, CircuitOpen, MissingKey,
+                        RateLimited,
+                        SchemaError, ServerError, TelegramAuthError,
+                        TransientNetworkError, UnexpectedStatusCode,
+                        UnknownStatus, WrongType)
+from hedging import Hedger
+from history import History
+from quota import QuotaManager
+from structured_logging import (JsonFormatter, RedactingFilter,
+                                SamplingFilter, redact)
+from warmup import (DnsCache, Warmer, host_of, make_session, open_connections,
+                    origin_of)
+from watchdog import Watchdog, serve
+
+STARTED = time.monotonic()
 
 load_dotenv()
 
+SAMPLED_EVENTS = ('message_sent', 'poll_done')
+
 logger = logging.getLogger(__name__)
 format = ('%(asctime)s, %(levelname)s, %(name)s,'
           '%(funcName)s, %(lineno)s, %(message)s')
-logger.setLevel(logging.DEBUG)
+if os.getenv('LOG_FORMAT') == 'json':
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter(format)
+logger.setLevel(os.getenv('LOG_LEVEL', 'DEBUG'))
+logger.addFilter(SamplingFilter(
+    int(os.getenv('LOG_SAMPLE_EVERY', 1)), SAMPLED_EVENTS))
+logger.addFilter(RedactingFilter())
 stream_handler = logging.StreamHandler()
-stream_handler.setFormatter(logging.Formatter(format))
+stream_handler.setFormatter(formatter)
 stream_handler.setLevel(logging.DEBUG)
 rotating_handler = logging.handlers.RotatingFileHandler(
     (__file__.rsplit('.', 1)[0] + '.log'), maxBytes=50000000, backupCount=5,)
-rotating_handler.setFormatter(logging.Formatter(format))
+rotating_handler.setFormatter(formatter)
 rotating_handler.setLevel(logging.DEBUG)
 
 
@@ -38,6 +73,73 @@ RETRY_TIME = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 10))
+TELEGRAM_CONNECT_TIMEOUT = float(os.getenv('TELEGRAM_CONNECT_TIMEOUT', 3.05))
+TELEGRAM_READ_TIMEOUT = float(os.getenv('TELEGRAM_READ_TIMEOUT', 10))
+
+HEDGER = Hedger(
+    enabled=os.getenv('HEDGE_REQUESTS', '0') == '1',
+    quantile=float(os.getenv('HEDGE_QUANTILE', 0.95)),
+    max_share=float(os.getenv('HEDGE_MAX_SHARE', 0.1)),
+)
+
+CASSETTE_PATH = os.getenv('CASSETTE_RECORD')
+CASSETTE = cassette.Cassette(
+    CASSETTE_PATH, secrets=(PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
+) if CASSETTE_PATH else None
+TRANSPORT = None
+HISTORY_PATH = os.getenv('HISTORY_PATH')
+HISTORY = History(HISTORY_PATH) if HISTORY_PATH else None
+SLEEP = time.sleep
+DELIVERED = set()
+
+RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', 3))
+BACKOFF_BASE = float(os.getenv('BACKOFF_BASE', 1))
+BACKOFF_MAX = float(os.getenv('BACKOFF_MAX', 30))
+RETRY_AFTER_MAX = float(os.getenv('RETRY_AFTER_MAX', 60))
+
+WATCHDOG = Watchdog(
+    deadline=float(os.getenv('WATCHDOG_DEADLINE', 300)),
+    period=RETRY_TIME * 1.5,
+    exit_on_stall=os.getenv('WATCHDOG_EXIT', '0') == '1',
+    logger=logger,
+)
+HEALTH_PORT = os.getenv('HEALTH_PORT')
+
+BREAKER_SETTINGS = {
+    'failures': (TransientNetworkError, ServerError),
+    'failure_threshold': int(os.getenv('BREAKER_FAILURES', 5)),
+    'recovery_time': float(os.getenv('BREAKER_RECOVERY_TIME', 300)),
+    'probes': int(os.getenv('BREAKER_PROBES', 1)),
+}
+PRACTICUM_BREAKER = CircuitBreaker('practicum', **BREAKER_SETTINGS)
+PRACTICUM_BREAKER.register_metrics()
+TELEGRAM_BREAKER = CircuitBreaker('telegram', **BREAKER_SETTINGS)
+TELEGRAM_BREAKER.register_metrics()
+
+QUOTA = QuotaManager(
+    rate=float(os.getenv('QUOTA_RPS', 10)),
+    burst=int(os.getenv('QUOTA_BURST', 20)),
+    max_wait=float(os.getenv('QUOTA_MAX_WAIT', 30)),
+    path=os.getenv('QUOTA_PATH'),
+)
+QUOTA.register_metrics()
+
+TELEGRAM_URL = 'https://api.telegram.org/'
+WARM_CONNECTIONS = int(os.getenv(
+    'WARM_CONNECTIONS', 2 if HEDGER.enabled else 1))
+KEEPALIVE_TIMEOUT = float(os.getenv('KEEPALIVE_TIMEOUT', 60))
+WARM_LEAD = float(os.getenv('WARM_LEAD', 5))
+DNS_TTL = float(os.getenv('DNS_TTL', 300))
+
+STATE_PATH = os.getenv(
+    'STATE_PATH', __file__.rsplit('.', 1)[0] + '.state.json')
+DUE_SLACK = RETRY_TIME / 10
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_DISABLED = 2
+
 
 HOMEWORK_STATUSES = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -45,13 +147,39 @@ HOMEWORK_STATUSES = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
-MESSAGE = 'Сообщение "{}" успешно отправлено.'
+MESSAGE = 'Сообщение "%s" успешно отправлено.'
+
+
+SEND_ERROR = 'Telegram не принял сообщение: {}'
+
+
+def deliver(bot, message):
+    """Передает сообщение в Telegram и классифицирует ошибки."""
+    try:
+        with WATCHDOG.task('telegram'):
+            bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message,
+                             timeout=TELEGRAM_READ_TIMEOUT)
+    except telegram.error.RetryAfter as error:
+        raise RateLimited(SEND_ERROR.format(error), error.retry_after)
+    except (telegram.error.Unauthorized,
+            telegram.error.InvalidToken) as error:
+        raise TelegramAuthError(SEND_ERROR.format(error))
+    except telegram.error.BadRequest:
+        raise
+    except telegram.error.NetworkError as error:
+        raise TransientNetworkError(SEND_ERROR.format(error))
 
 
 def send_message(bot, message):
     """Бот отправляет сообщение."""
-    bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-    logger.info(MESSAGE.format(message))
+    TELEGRAM_BREAKER.call(deliver, bot, message)
+    if 'startup_to_first_notification' not in metrics.VALUES:
+        metrics.record(
+            'startup_to_first_notification', time.monotonic() - STARTED)
+    if CASSETTE:
+        CASSETTE.record_message(message)
+    logger.info(MESSAGE, message,
+                extra={'event': 'message_sent', 'tenant': tenant_id()})
 
 
 API_ERROR_DESCRIPTION = ('При выполнении запроса с параметрами {}, {}, {},'
@@ -61,38 +189,148 @@ CONNECTION_ERROR = (
 UNEXPECTED_RESPONSE = ('Неожиданный ответ от сервера.'
                        'Параметры запроса: {}, {}, {}'
                        'Получен ключ: {}, со значением: {}')
+INVALID_JSON = ('Ответ сервера на запрос с параметрами {}, {}, {} '
+                'не является JSON: {}')
+AUTH_STATUSES = (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN)
+
+
+def parse_retry_after(value):
+    """Возвращает паузу из заголовка Retry-After в секундах."""
+    if value is None:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0, int(date.timestamp() - time.time()))
+
+
+def check_status_code(response, params):
+    """Выбрасывает исключение, соответствующее статус-коду ответа."""
+    status_code = response.status_code
+    if status_code == HTTPStatus.OK:
+        return
+    description = API_ERROR_DESCRIPTION.format(
+        ENDPOINT, redact(HEADERS), params, status_code)
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        raise RateLimited(description, parse_retry_after(
+            response.headers.get('Retry-After')))
+    if status_code in AUTH_STATUSES:
+        raise AuthError(description)
+    if (status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or status_code == HTTPStatus.REQUEST_TIMEOUT):
+        raise ServerError(description)
+    raise UnexpectedStatusCode(description)
+
+
+def fetch(params):
+    """Отправляет запрос к API."""
+    return (TRANSPORT or requests.get)(
+        ENDPOINT, headers=HEADERS, params=params,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+
+def record_latency(started):
+    """Сохраняет в метриках время ответа API."""
+    now = time.monotonic()
+    metrics.record('poll_latency', now - started)
+    previous = metrics.VALUES.get('last_poll')
+    if previous is not None and started - previous > KEEPALIVE_TIMEOUT:
+        metrics.record('idle_poll_latency', now - started)
+    metrics.record('last_poll', now)
+
+
+def request_api(params):
+    """Отправляет запрос к API и проверяет статус-код ответа."""
+    started = time.monotonic()
+    try:
+        with WATCHDOG.task('practicum'):
+            response = HEDGER.call(
+                partial(fetch, params), admit=QUOTA.try_acquire)
+    except RequestException as error:
+        if CASSETTE:
+            CASSETTE.record_error(params, error)
+        raise TransientNetworkError(
+            CONNECTION_ERROR.format(ENDPOINT, params, redact(HEADERS), error))
+    record_latency(started)
+    if CASSETTE:
+        CASSETTE.record_response(params, response)
+    try:
+        check_status_code(response, params)
+    except RateLimited as error:
+        QUOTA.throttle(error.retry_after)
+        raise
+    QUOTA.recover()
+    return response
 
 
 def get_api_answer(current_timestamp):
     """Функция делает запрос к API Яндекс практикума."""
     params = {'from_date': current_timestamp}
+    QUOTA.acquire()
+    response = PRACTICUM_BREAKER.call(request_api, params)
     try:
-        response = requests.get(
-            ENDPOINT, headers=HEADERS, params=params
-        )
-    except RequestException as error:
-        raise ConnectionError(
-            CONNECTION_ERROR.format(ENDPOINT, params, HEADERS, error))
-    saved_json = response.json()
+        saved_json = response.json()
+    except ValueError as error:
+        raise SchemaError(
+            INVALID_JSON.format(ENDPOINT, redact(HEADERS), params, error))
     error_keys = ('code', 'error')
-    status_code = response.status_code
-    if response.status_code != HTTPStatus.OK:
-        raise UnexpectedStatusCode(API_ERROR_DESCRIPTION.
-                                   format(ENDPOINT,
-                                          HEADERS,
-                                          params,
-                                          status_code))
     for key in error_keys:
         if key in saved_json:
-            raise ValueError(UNEXPECTED_RESPONSE
-                             .format(ENDPOINT,
-                                     HEADERS,
-                                     params,
-                                     key,
-                                     saved_json[key]))
+            raise ApiErrorResponse(UNEXPECTED_RESPONSE
+                                   .format(ENDPOINT,
+                                           redact(HEADERS),
+                                           params,
+                                           key,
+                                           saved_json[key]))
     return saved_json
 
 
+RETRY = 'Повтор %s через %.1f с. после ошибки: %s'
+
+
+def retry_delay(error, attempt):
+    """Пауза перед повтором запроса или None, если повторять не нужно."""
+    if attempt >= RETRY_ATTEMPTS:
+        return None
+    if error.retry_policy == RETRY_AFTER and error.retry_after is not None:
+        if error.retry_after > RETRY_AFTER_MAX:
+            return None
+        return error.retry_after
+    if error.retry_policy in (RETRY_BACKOFF, RETRY_AFTER):
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(
+            0.5, 1)
+    return None
+
+
+def with_retries(func, *args):
+    """Вызывает функцию, повторяя ее согласно политике ошибки.
+
+    Если повтор отклонен разомкнутой цепью, выбрасывается исходная ошибка.
+    """
+    attempt = 0
+    previous = None
+    while True:
+        try:
+            return func(*args)
+        except CircuitOpen:
+            if previous is None:
+                raise
+            raise previous
+        except BotError as error:
+            previous = error
+            delay = retry_delay(error, attempt)
+            if delay is None:
+                raise
+            logger.warning(RETRY, func.__name__, delay, error)
+            SLEEP(delay)
+            attempt += 1
+
+
 KEY_MISSING = 'В запросе нет ключа {}.'
 TYPE_NOT_DICT = 'Ответ API не является словарем.'
 RESPONSE_NOT_LIST = 'Ответ API не содержит список.'
@@ -101,14 +339,12 @@ RESPONSE_NOT_LIST = 'Ответ API не содержит список.'
 def check_response(response):
     """Проверяем корректность ответа API."""
     if type(response) is not dict:
-        raise TypeError(TYPE_NOT_DICT)
-    homework = response['homeworks']
+        raise WrongType(TYPE_NOT_DICT)
     if 'homeworks' not in response:
-        raise KeyError(KEY_MISSING.format(homework))
+        raise MissingKey(KEY_MISSING.format('homeworks'))
+    homework = response['homeworks']
     if not isinstance(homework, list):
-        raise TypeError(RESPONSE_NOT_LIST)
-    if response['homeworks'] == []:
-        return []
+        raise WrongType(RESPONSE_NOT_LIST)
     return homework
 
 
@@ -118,15 +354,70 @@ CHANGE_STATUS = 'Изменился статус проверки работы "
 
 def parse_status(homework):
     """Возвращает статус домашнего задания."""
+    for key in ('homework_name', 'status'):
+        if key not in homework:
+            raise MissingKey(KEY_MISSING.format(key))
     name = homework['homework_name']
     status = homework['status']
-    verdict = HOMEWORK_STATUSES[status]
     if status not in HOMEWORK_STATUSES:
-        raise ValueError(UNEXPECTED_STATUS.format(status))
-    return CHANGE_STATUS.format(name, verdict)
+        raise UnknownStatus(UNEXPECTED_STATUS.format(status))
+    return CHANGE_STATUS.format(name, HOMEWORK_STATUSES[status])
+
+
+HOMEWORK_SCHEMA = (
+    ('homework_name', str, None),
+    ('status', str, HOMEWORK_STATUSES),
+)
+RECORD_NOT_DICT = 'запись не является словарем'
+FIELD_MISSING = 'нет ключа {}'
+FIELD_TYPE = 'ключ {} имеет тип {}'
+FIELD_VALUE = 'ключ {} имеет недопустимое значение {}'
+QUARANTINED = 'Домашняя работа %s пропущена: %s.'
+
+
+def check_field(key, expected_type, allowed, record):
+    """Возвращает описание ошибки в поле записи или None."""
+    if key not in record:
+        return FIELD_MISSING.format(key)
+    value = record[key]
+    if not isinstance(value, expected_type):
+        return FIELD_TYPE.format(key, type(value).__name__)
+    if allowed is not None and value not in allowed:
+        return FIELD_VALUE.format(key, value)
+    return None
 
 
-TOKEN_ERROR = 'Отсутствует обязательная переменная окружения: {}'
+def build_validator(schema):
+    """Собирает из схемы функцию, возвращающую все ошибки записи."""
+    checks = [partial(check_field, *field) for field in schema]
+
+    def validate(record):
+        if not isinstance(record, dict):
+            return [RECORD_NOT_DICT]
+        return [error for error in (check(record) for check in checks)
+                if error]
+
+    return validate
+
+
+validate_homework = build_validator(HOMEWORK_SCHEMA)
+
+
+def split_homeworks(homeworks):
+    """Отбирает корректные работы, остальные помещает в карантин."""
+    valid = []
+    for homework in homeworks:
+        errors = validate_homework(homework)
+        if errors:
+            metrics.increment('quarantined_homeworks')
+            logger.warning(QUARANTINED, homework, '; '.join(errors),
+                           extra={'event': 'quarantined'})
+        else:
+            valid.append(homework)
+    return valid
+
+
+TOKEN_ERROR = 'Отсутствует обязательная переменная окружения: %s'
 
 TOKENS = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
 
@@ -137,15 +428,182 @@ def check_tokens():
     for name in TOKENS:
         if globals()[name] is None:
             name_in_globals = False
-            logger.critical(TOKEN_ERROR.format(name))
+            logger.critical(TOKEN_ERROR, name)
     return name_in_globals
 
 
 ENV_NONE = 'Отсутствие обязательных переменных окружения'
 TOKEN_CHECK = 'Проверьте токены приложения'
 PROGRAMM_ERROR = 'Сбой в работе программы: {}'
-MESSAGE_ERROR = ('Не удалось отправить сообщение "{}".'
-                 'Произошла ошибка: {}')
+BREAKER_OPENED = ' Запросы к API приостановлены на {:.0f} с.'
+TENANT_DISABLED = 'Токен отклонен, опрос API остановлен.'
+STATE_ERROR = 'Не удалось прочитать состояние из %s: %s'
+POLL_DONE = 'Опрос API завершен, работ с новым статусом: %s.'
+HISTORY_ERROR = 'Не удалось сохранить историю статусов: %s'
+NOT_DELIVERED = 'Уведомление о работе %s не доставлено: %s'
+MESSAGE_ERROR = ('Не удалось отправить сообщение "%s".'
+                 'Произошла ошибка: %s')
+
+
+def run_cycle(bot, current_timestamp):
+    """Один цикл опроса API и отправки уведомлений."""
+    if CASSETTE:
+        CASSETTE.record_cycle(current_timestamp)
+    with WATCHDOG.task('cycle'):
+        return poll(bot, current_timestamp)
+
+
+def alert_text(error, breaker_closed):
+    """Текст уведомления о сбое или None, если опрос уже приостановлен."""
+    message = PROGRAMM_ERROR.format(error)
+    if PRACTICUM_BREAKER.state == OPEN:
+        if not breaker_closed:
+            return None
+        return message + BREAKER_OPENED.format(PRACTICUM_BREAKER.recovery_time)
+    if isinstance(error, CircuitOpen):
+        return None
+    return message
+
+
+def save_history(homeworks):
+    """Сохраняет статусы в историю, не прерывая цикл при ошибке базы."""
+    if not HISTORY:
+        return
+    try:
+        HISTORY.append(tenant_id(), homeworks)
+    except sqlite3.Error as error:
+        metrics.increment('history_errors')
+        logger.warning(HISTORY_ERROR, error)
+
+
+def delivery_key(homework):
+    """Ключ уведомления о статусе работы."""
+    return (homework['homework_name'], homework['status'],
+            homework.get('date_updated'))
+
+
+def notify(bot, homeworks):
+    """Отправляет уведомления, еще не доставленные с прошлой метки времени.
+
+    Ошибка отправки одного уведомления не мешает остальным, доставленные
+    уведомления запоминаются и не повторяются в следующем цикле.
+    """
+    failure = None
+    for homework in reversed(homeworks):
+        key = delivery_key(homework)
+        if key in DELIVERED:
+            continue
+        try:
+            with_retries(send_message, bot, parse_status(homework))
+        except Exception as error:
+            logger.warning(NOT_DELIVERED, key[0], error)
+            failure = failure or error
+            continue
+        DELIVERED.add(key)
+    if failure:
+        raise failure
+
+
+def poll(bot, current_timestamp):
+    """Запрашивает статусы работ и уведомляет об изменениях."""
+    breaker_closed = PRACTICUM_BREAKER.state == CLOSED
+    try:
+        response = with_retries(get_api_answer, current_timestamp)
+        homeworks = split_homeworks(check_response(response))
+        save_history(homeworks)
+        notify(bot, homeworks)
+        DELIVERED.clear()
+        logger.debug(POLL_DONE, len(homeworks),
+                     extra={'event': 'poll_done', 'tenant': tenant_id()})
+        return response.get('current_date', current_timestamp)
+    except Exception as error:
+        metrics.increment('failed_cycles')
+        message = alert_text(error, breaker_closed)
+        if message is None:
+            logger.warning(PROGRAMM_ERROR.format(error))
+            return current_timestamp
+        logger.exception(message)
+        try:
+            send_message(bot, message)
+        except Exception as send_error:
+            logger.exception(MESSAGE_ERROR, message, send_error)
+        if getattr(error, 'retry_policy', None) == DISABLE:
+            raise
+    return current_timestamp
+
+
+def tenant_id():
+    """Обезличенный идентификатор владельца токена Яндекс практикума."""
+    return hashlib.sha256(str(PRACTICUM_TOKEN).encode()).hexdigest()[:12]
+
+
+def load_state():
+    """Читает сохраненное состояние опроса."""
+    try:
+        with open(STATE_PATH, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError as error:
+        logger.error(STATE_ERROR, STATE_PATH, error)
+        return {}
+
+
+def save_state(state):
+    """Атомарно сохраняет состояние опроса."""
+    temporary = STATE_PATH + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(state, file)
+    os.replace(temporary, STATE_PATH)
+
+
+def checkpoint(state, current_timestamp):
+    """Сохраняет метку времени, время следующего опроса и доставленное."""
+    state['current_timestamp'] = current_timestamp
+    state['next_poll'] = time.time() + RETRY_TIME
+    state['delivered'] = list(DELIVERED)
+    save_state(state)
+
+
+def disable(state):
+    """Отключает опрос для текущего токена."""
+    logger.critical(TENANT_DISABLED)
+    state['disabled'] = tenant_id()
+    save_state(state)
+
+
+def make_bot():
+    """Создает бота Telegram."""
+    return telegram.Bot(
+        token=TELEGRAM_TOKEN,
+        request=telegram.utils.request.Request(
+            con_pool_size=WARM_CONNECTIONS,
+            connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+            read_timeout=TELEGRAM_READ_TIMEOUT,
+        ),
+    )
+
+
+def ping(session):
+    """Открывает соединение с хостом API запросом к корню сайта без токена."""
+    session.head(origin_of(ENDPOINT), timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+
+def warm_up(bot=None):
+    """Разрешает DNS и открывает соединения с API до первого опроса."""
+    global TRANSPORT
+    dns_cache = DnsCache((host_of(ENDPOINT), host_of(TELEGRAM_URL)), DNS_TTL)
+    dns_cache.install()
+    session = make_session(WARM_CONNECTIONS)
+    targets = {'practicum': partial(
+        open_connections, partial(ping, session), WARM_CONNECTIONS)}
+    if bot is not None:
+        targets['telegram'] = bot.get_me
+    warmer = Warmer(targets, dns_cache=dns_cache, keepalive=KEEPALIVE_TIMEOUT,
+                    lead=WARM_LEAD, logger=logger)
+    warmer.warm()
+    TRANSPORT = session.get
+    return warmer
 
 
 def main():
@@ -154,26 +612,108 @@ def main():
     if not check_tokens():
         logger.critical(ENV_NONE)
         raise ValueError(TOKEN_CHECK)
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
+    state = load_state()
+    DELIVERED.update(map(tuple, state.get('delivered', [])))
+    if state.get('disabled') == tenant_id():
+        logger.critical(TENANT_DISABLED)
+        return
+    bot = make_bot()
+    warmer = warm_up(bot)
+    WATCHDOG.start()
+    if HEALTH_PORT:
+        serve(WATCHDOG, int(HEALTH_PORT))
+    current_timestamp = state.get('current_timestamp', int(time.time()))
     while True:
         try:
-            response = get_api_answer(current_timestamp)
-            homework = check_response(response)
-            if homework:
-                message = parse_status(homework[0])
-                send_message(bot, message)
-            current_timestamp = response.get('current_date', current_timestamp)
-        except Exception as error:
-            message = PROGRAMM_ERROR.format(error)
-            logger.exception(message)
-            try:
-                send_message(bot, message)
-            except Exception as error:
-                logger.exception(MESSAGE_ERROR.format(message, error))
-        time.sleep(RETRY_TIME)
+            current_timestamp = run_cycle(bot, current_timestamp)
+        except AuthError:
+            disable(state)
+            return
+        checkpoint(state, current_timestamp)
+        warmer.wait(QUOTA.until_slot(tenant_id(), RETRY_TIME),
+                    metrics.VALUES.get('last_poll'))
 
 
-if __name__ == '__main__':
+NOT_DUE = 'Следующий опрос API не раньше чем через %.0f с.'
 
-    main()
+
+def poll_once():
+    """Выполняет один цикл опроса и возвращает код завершения."""
+    if not check_tokens():
+        logger.critical(ENV_NONE)
+        return EXIT_FAILED
+    state = load_state()
+    DELIVERED.update(map(tuple, state.get('delivered', [])))
+    if state.get('disabled') == tenant_id():
+        logger.critical(TENANT_DISABLED)
+        return EXIT_DISABLED
+    wait = state.get('next_poll', 0) - DUE_SLACK - time.time()
+    if wait > 0:
+        logger.debug(NOT_DUE, wait)
+        return EXIT_OK
+    failed_cycles = metrics.COUNTERS['failed_cycles']
+    try:
+        current_timestamp = run_cycle(
+            make_bot(), state.get('current_timestamp', int(time.time())))
+    except AuthError:
+        disable(state)
+        return EXIT_DISABLED
+    checkpoint(state, current_timestamp)
+    if metrics.COUNTERS['failed_cycles'] > failed_cycles:
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+REPLAY_DONE = 'Воспроизведено запросов: %s, уведомлений: %s.'
+
+
+def replay(path, speed=0):
+    """Прогоняет записанный трафик через логику бота и сверяет уведомления."""
+    global TRANSPORT, SLEEP, QUOTA, PRACTICUM_BREAKER, TELEGRAM_BREAKER
+    global DELIVERED
+    player = cassette.Player(
+        cassette.load(path), speed,
+        secrets=(PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID))
+    saved = QUOTA, PRACTICUM_BREAKER, TELEGRAM_BREAKER, DELIVERED
+    TRANSPORT, SLEEP, QUOTA = player.get, player.sleep, QuotaManager()
+    DELIVERED = set()
+    PRACTICUM_BREAKER, TELEGRAM_BREAKER = (
+        CircuitBreaker(name, clock=player.clock, **BREAKER_SETTINGS)
+        for name in ('practicum', 'telegram'))
+    try:
+        current_timestamp = player.first_timestamp()
+        for _ in player.cycles():
+            current_timestamp = run_cycle(player, current_timestamp)
+    except AuthError:
+        logger.critical(TENANT_DISABLED)
+    finally:
+        TRANSPORT, SLEEP = None, time.sleep
+        QUOTA, PRACTICUM_BREAKER, TELEGRAM_BREAKER, DELIVERED = saved
+    player.verify()
+    logger.info(REPLAY_DONE, player.position, len(player.sent))
+
+
+def parse_args():
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Бот для проверки статуса домашней работы.')
+    modes = parser.add_subparsers(dest='mode')
+    modes.add_parser(
+        'poll-once', help='выполнить один цикл опроса и завершиться')
+    replay_parser = modes.add_parser(
+        'replay', help='воспроизвести записанный трафик')
+    replay_parser.add_argument('cassette', help='файл с записью трафика')
+    replay_parser.add_argument(
+        '--speed', type=float, default=0,
+        help='ускорение пауз между запросами, 0 - без пауз')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.mode == 'poll-once':
+        sys.exit(poll_once())
+    elif args.mode == 'replay':
+        replay(args.cassette, args.speed)
+    else:
+        main()
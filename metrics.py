@@ -0,0 +1,33 @@
+import threading
+from collections import Counter
+
+COUNTERS = Counter()
+GAUGES = {}
+VALUES = {}
+_lock = threading.Lock()
+
+
+def increment(name, value=1):
+    """Увеличивает счетчик."""
+    with _lock:
+        COUNTERS[name] += value
+
+
+def record(name, value):
+    """Запоминает последнее измеренное значение."""
+    VALUES[name] = value
+
+
+def gauge(name, func):
+    """Регистрирует функцию, возвращающую текущее значение метрики."""
+    GAUGES[name] = func
+
+
+def snapshot():
+    """Возвращает текущие значения всех метрик."""
+    with _lock:
+        values = dict(COUNTERS)
+    values.update(VALUES)
+    for name, func in GAUGES.items():
+        values[name] = func()
+    return values
@@ -0,0 +1,172 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+from exceptions import QuotaExceeded
+
+QUOTA_EXCEEDED = 'Запрос отклонен: лимит запросов исчерпан на {:.1f} с.'
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS bucket (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    paused_until REAL NOT NULL,
+    rate REAL NOT NULL
+)
+'''
+INSERT_BUCKET = '''
+INSERT OR IGNORE INTO bucket (id, tokens, updated, paused_until, rate)
+VALUES (1, ?, ?, ?, ?)
+'''
+SELECT_BUCKET = 'SELECT tokens, updated, paused_until, rate FROM bucket'
+UPDATE_BUCKET = '''
+UPDATE bucket SET tokens = ?, updated = ?, paused_until = ?, rate = ?
+WHERE id = 1
+'''
+
+
+class QuotaManager:
+    """Лимит запросов к API Яндекс практикума.
+
+    Запросы проходят через корзину токенов со скоростью `rate` запросов
+    в секунду и запасом `burst`. Ответ 429 приостанавливает выдачу токенов
+    на время из Retry-After и вдвое снижает скорость, успешные ответы
+    постепенно возвращают ее к исходной. Если токен нельзя получить за
+    `max_wait` секунд, запрос отбрасывается. При `rate=None` лимита нет.
+
+    Без `path` корзина живет в памяти и ограничивает только запросы своего
+    процесса. С `path` ее состояние хранится в файле SQLite, и лимит общий
+    для всех процессов на машине, которые используют этот файл. Разнесение
+    опросов по слотам (`until_slot`) работает между процессами всегда.
+    """
+
+    def __init__(self, rate=None, burst=1, max_wait=30, min_rate=None,
+                 pause=60, path=None):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.min_rate = min_rate or (rate / 10 if rate else None)
+        self.pause = pause
+        self.tokens = burst
+        self.updated = time.time()
+        self.paused_until = 0
+        self.waiting = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        if path and rate is not None:
+            self._connection = sqlite3.connect(
+                path, timeout=max_wait, isolation_level=None,
+                check_same_thread=False)
+            self._connection.execute(SCHEMA)
+            self._connection.execute(INSERT_BUCKET, self._values())
+
+    def register_metrics(self):
+        """Публикует глубину очереди и текущую скорость в метриках."""
+        metrics.gauge('quota_queue_depth', lambda: self.waiting)
+        metrics.gauge('quota_rate', lambda: self.rate)
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _delay(self, now):
+        if now >= self.paused_until and self.tokens >= 1:
+            return 0
+        return max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+    def _values(self):
+        return self.tokens, self.updated, self.paused_until, self.rate
+
+    @contextmanager
+    def _bucket(self):
+        """Блокирует корзину и загружает ее состояние из общего файла."""
+        with self._lock:
+            if self._connection is None:
+                yield
+                return
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                (self.tokens, self.updated, self.paused_until,
+                 self.rate) = self._connection.execute(
+                    SELECT_BUCKET).fetchone()
+                yield
+                self._connection.execute(UPDATE_BUCKET, self._values())
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+
+    def _take(self):
+        """Берет токен и возвращает 0 или паузу до появления токена."""
+        with self._bucket():
+            now = time.time()
+            self._refill(now)
+            delay = self._delay(now)
+            if not delay:
+                self.tokens -= 1
+            return delay
+
+    def acquire(self):
+        """Ждет разрешения на запрос или выбрасывает QuotaExceeded."""
+        if self.rate is None:
+            return
+        deadline = time.time() + self.max_wait
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                delay = self._take()
+                if not delay:
+                    return
+                if time.time() + delay > deadline:
+                    metrics.increment('quota_shed')
+                    raise QuotaExceeded(QUOTA_EXCEEDED.format(delay))
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def try_acquire(self):
+        """Берет разрешение на запрос, только если оно доступно сразу."""
+        return self.rate is None or not self._take()
+
+    def throttle(self, retry_after=None):
+        """Снижает скорость после ответа 429."""
+        if self.rate is None:
+            return
+        metrics.increment('quota_throttled')
+        with self._bucket():
+            now = time.time()
+            self._refill(now)
+            self.paused_until = max(
+                self.paused_until, now + (retry_after or self.pause))
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        """Постепенно возвращает скорость после успешного ответа."""
+        if self.rate is None:
+            return
+        with self._bucket():
+            if self.rate < self.base_rate:
+                self._refill(time.time())
+                self.rate = min(
+                    self.base_rate, self.rate + self.base_rate / 10)
+
+    @staticmethod
+    def until_slot(key, interval, now=None):
+        """Секунды до ближайшего слота опроса, закрепленного за ключом.
+
+        Слоты разных ключей равномерно распределены по интервалу, поэтому
+        токены не опрашивают API в одну и ту же секунду.
+        """
+        now = time.time() if now is None else now
+        offset = int(hashlib.sha256(key.encode()).hexdigest(), 16) % interval
+        delay = (offset - now) % interval
+        if delay < interval / 2:
+            delay += interval
+        return delay
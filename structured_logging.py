@@ -0,0 +1,95 @@
+import json
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+HIDDEN = '***'
+SECRET_FIELDS = frozenset((
+    'authorization', 'token', 'practicum_token', 'telegram_token', 'chat_id',
+))
+STANDARD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord('', 0, '', 0, '', (), None))
+) | {'message', 'asctime'}
+
+
+def redact(value, fields=SECRET_FIELDS):
+    """Заменяет значения секретных полей в словарях и списках."""
+    if isinstance(value, dict):
+        return {
+            key: HIDDEN if str(key).lower() in fields else redact(item, fields)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item, fields) for item in value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Скрывает секретные поля в аргументах и дополнительных полях записи."""
+
+    def __init__(self, fields=SECRET_FIELDS):
+        super().__init__()
+        self.fields = fields
+
+    def filter(self, record):
+        if isinstance(record.args, dict):
+            record.args = redact(record.args, self.fields)
+        elif record.args:
+            record.args = tuple(
+                redact(arg, self.fields) for arg in record.args)
+        for key in vars(record).keys() - STANDARD_ATTRIBUTES:
+            if key.lower() in self.fields:
+                setattr(record, key, HIDDEN)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только каждое `every`-е повторяющееся событие.
+
+    Выборка применяется к записям уровня `level` и ниже, а также к записям
+    с полем `event` из `events`, и ведется отдельно для каждого значения
+    поля `tenant`. Остальные записи проходят всегда.
+    """
+
+    def __init__(self, every=1, events=(), level=logging.DEBUG):
+        super().__init__()
+        self.every = every
+        self.events = frozenset(events)
+        self.level = level
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.every <= 1:
+            return True
+        event = getattr(record, 'event', None)
+        if record.levelno > self.level and event not in self.events:
+            return True
+        key = (getattr(record, 'tenant', None), event or record.msg)
+        with self._lock:
+            count = self.counts[key]
+            self.counts[key] += 1
+        return count % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись как одну строку JSON."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'func': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in STANDARD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
@@ -0,0 +1,83 @@
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import CircuitOpen, QuotaExceeded, ServerError, WrongType
+
+
+def fail():
+    raise ServerError('сбой')
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker('test', (ServerError,), failure_threshold=2)
+        calls = []
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                breaker.call(fail)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            breaker.call(calls.append, 1)
+        assert not calls, (
+            'Убедитесь, что при разомкнутой цепи запрос не выполняется'
+        )
+
+    def test_probe_closes_circuit(self):
+        breaker = CircuitBreaker(
+            'test', (ServerError,), failure_threshold=1, recovery_time=0)
+        with pytest.raises(ServerError):
+            breaker.call(fail)
+        assert breaker.call(lambda: 'ok') == 'ok'
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens_circuit(self):
+        breaker = CircuitBreaker(
+            'test', (ServerError,), failure_threshold=1, recovery_time=0)
+        with pytest.raises(ServerError):
+            breaker.call(fail)
+        with pytest.raises(ServerError):
+            breaker.call(fail)
+        assert breaker.state == OPEN
+
+    def test_probe_budget(self):
+        breaker = CircuitBreaker(
+            'test', (ServerError,), failure_threshold=1, recovery_time=0)
+        with pytest.raises(ServerError):
+            breaker.call(fail)
+
+        def nested_call():
+            assert breaker.state == HALF_OPEN
+            with pytest.raises(CircuitOpen):
+                breaker.call(lambda: None)
+
+        breaker.call(nested_call)
+
+    def test_other_errors_are_not_failures(self):
+        breaker = CircuitBreaker('test', (ServerError,), failure_threshold=1)
+
+        def bad_schema():
+            raise WrongType('схема')
+
+        with pytest.raises(WrongType):
+            breaker.call(bad_schema)
+        assert breaker.state == CLOSED
+
+    def test_local_rejections_are_ignored(self):
+        breaker = CircuitBreaker(
+            'test', (ServerError,), failure_threshold=1, recovery_time=0)
+        with pytest.raises(ServerError):
+            breaker.call(fail)
+
+        def shed():
+            raise QuotaExceeded('лимит')
+
+        with pytest.raises(QuotaExceeded):
+            breaker.call(shed)
+        assert breaker.state == HALF_OPEN and breaker.failure_count == 1, (
+            'Убедитесь, что отказ лимита не замыкает цепь '
+            'и не сбрасывает счетчик сбоев'
+        )
+        assert breaker.call(lambda: 'ok') == 'ok', (
+            'Убедитесь, что отказ лимита возвращает пробный вызов'
+        )
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+import requests
+
+import cassette
+from breaker import CircuitBreaker
+from exceptions import ReplayMismatch
+
+
+class MockResponse:
+
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+        self.text = json.dumps(body)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class MockBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append(text)
+
+
+class TestCassette:
+
+    def record(self, monkeypatch, tmp_path):
+        import homework
+
+        path = tmp_path / 'cassette.jsonl'
+        responses = iter([
+            {'homeworks': [], 'current_date': 100},
+            {
+                'homeworks': [
+                    {'homework_name': 'hw1', 'status': 'approved'}
+                ],
+                'current_date': 200,
+            },
+        ])
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockResponse(next(responses)))
+        monkeypatch.setattr(homework, 'HEADERS',
+                            {'Authorization': 'OAuth secret-token'})
+        monkeypatch.setattr(homework, 'CASSETTE', cassette.Cassette(path))
+        bot = MockBot()
+        timestamp = homework.run_cycle(bot, 1)
+        homework.run_cycle(bot, timestamp)
+        monkeypatch.setattr(homework, 'CASSETTE', None)
+        return path, bot.sent
+
+    def test_record_is_sanitized(self, monkeypatch, tmp_path):
+        path, _ = self.record(monkeypatch, tmp_path)
+        assert 'secret-token' not in path.read_text(encoding='utf-8'), (
+            'Убедитесь, что токены не попадают в запись трафика'
+        )
+        kinds = [entry['kind'] for entry in cassette.load(path)]
+        assert kinds == [
+            'cycle', 'practicum', 'cycle', 'practicum', 'telegram']
+
+    def test_replay_matches_record(self, monkeypatch, tmp_path):
+        path, sent = self.record(monkeypatch, tmp_path)
+        import homework
+
+        monkeypatch.setattr(requests, 'get', None)
+        homework.replay(path)
+        assert len(sent) == 1
+
+    def test_replay_detects_mismatch(self, monkeypatch, tmp_path):
+        path, _ = self.record(monkeypatch, tmp_path)
+        import homework
+
+        entries = cassette.load(path)
+        entries[-1]['text'] = 'другое уведомление'
+        path.write_text(
+            '\n'.join(json.dumps(entry) for entry in entries),
+            encoding='utf-8')
+        with pytest.raises(ReplayMismatch):
+            homework.replay(path)
+
+    def test_replay_with_open_breaker(self, monkeypatch, tmp_path):
+        import homework
+
+        path = tmp_path / 'cassette.jsonl'
+        settings = {**homework.BREAKER_SETTINGS, 'failure_threshold': 2}
+        monkeypatch.setattr(homework, 'BREAKER_SETTINGS', settings)
+        monkeypatch.setattr(homework, 'PRACTICUM_BREAKER',
+                            CircuitBreaker('practicum', **settings))
+        monkeypatch.setattr(homework, 'SLEEP', lambda delay: None)
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockResponse({}, status_code=502))
+        monkeypatch.setattr(homework, 'CASSETTE', cassette.Cassette(path))
+        bot = MockBot()
+        for _ in range(4):
+            homework.run_cycle(bot, 1)
+        monkeypatch.setattr(homework, 'CASSETTE', None)
+        assert len(bot.sent) == 1
+
+        monkeypatch.setattr(requests, 'get', None)
+        homework.replay(path)
+
+    def test_replay_without_requests(self, tmp_path):
+        import homework
+
+        path = tmp_path / 'cassette.jsonl'
+        path.write_text(json.dumps(
+            {'kind': 'cycle', 'time': 0, 'from_date': 1}), encoding='utf-8')
+        with pytest.raises(ReplayMismatch):
+            homework.replay(path)
+        path.write_text('', encoding='utf-8')
+        with pytest.raises(ReplayMismatch):
+            homework.replay(path)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from hedging import Hedger
+
+
+class TestHedger:
+
+    def test_disabled_calls_once(self):
+        hedger = Hedger()
+        calls = []
+        result = hedger.call(lambda: calls.append(1) or 'ok')
+        assert result == 'ok' and calls == [1], (
+            'Без включенного дублирования запрос должен выполняться один раз'
+        )
+
+    def test_slow_request_is_hedged(self):
+        hedger = Hedger(enabled=True, max_share=1, min_samples=1)
+        hedger.latencies.append(0.01)
+        release = threading.Event()
+        calls = []
+
+        def request():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(1)
+                return 'slow'
+            return 'fast'
+
+        started = time.monotonic()
+        result = hedger.call(request)
+        release.set()
+        assert result == 'fast', (
+            'Проверьте, что возвращается первый полученный ответ'
+        )
+        assert time.monotonic() - started < 0.5
+        assert hedger.hedges == 1
+
+    def test_hedges_are_capped(self):
+        hedger = Hedger(enabled=True, max_share=0.1, min_samples=1)
+        hedger.latencies.append(0.001)
+        hedger.call(lambda: time.sleep(0.02))
+        assert hedger.hedges == 0, (
+            'Доля продублированных запросов не должна превышать max_share'
+        )
+
+    def test_hedge_needs_admission(self):
+        hedger = Hedger(enabled=True, max_share=1, min_samples=1)
+        hedger.latencies.append(0.001)
+        calls = []
+
+        def request():
+            calls.append(1)
+            time.sleep(0.02)
+
+        hedger.call(request, admit=lambda: False)
+        assert calls == [1] and hedger.hedges == 0, (
+            'Дубль не должен отправляться, если лимит запросов исчерпан'
+        )
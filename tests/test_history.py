@@ -0,0 +1,62 @@
+from history import History, parse_date
+
+HOUR = 3600
+
+
+def homework(name, status, changed_at):
+    return {
+        'homework_name': name,
+        'status': status,
+        'date_updated': changed_at,
+    }
+
+
+class TestHistory:
+
+    def make_history(self, tmp_path):
+        history = History(str(tmp_path / 'history.sqlite3'))
+        history.append('tenant', [
+            homework('hw1', 'reviewing', '2022-01-01T00:00:00Z'),
+            homework('hw2', 'reviewing', '2022-01-01T00:00:00Z'),
+            homework('hw3', 'reviewing', '2022-01-01T00:00:00Z'),
+        ])
+        history.append('tenant', [
+            homework('hw1', 'approved', '2022-01-01T01:00:00Z'),
+            homework('hw2', 'rejected', '2022-01-01T02:00:00Z'),
+        ])
+        history.append('tenant', [
+            homework('hw2', 'reviewing', '2022-01-01T03:00:00Z'),
+            homework('hw2', 'approved', '2022-01-01T04:00:00Z'),
+        ])
+        history.append('other', [
+            homework('hw1', 'reviewing', '2022-01-01T00:00:00Z'),
+        ])
+        return history
+
+    def test_parse_date(self):
+        assert parse_date('2022-01-01T00:00:00Z') == 1640995200
+        assert parse_date('вчера') is None
+        assert parse_date(None) is None
+
+    def test_turnaround(self, tmp_path):
+        history = self.make_history(tmp_path)
+        result = history.turnaround(since=0)
+        assert result['count'] == 2
+        assert result['p50'] == HOUR and result['p99'] == 4 * HOUR, (
+            'Проверьте расчет перцентилей времени проверки'
+        )
+        assert history.turnaround(since=2 ** 40)['count'] == 0
+
+    def test_repeated_observations_are_ignored(self, tmp_path):
+        history = self.make_history(tmp_path)
+        history.append('tenant', [
+            homework('hw1', 'approved', '2022-01-01T01:00:00Z'),
+        ])
+        assert history.turnaround(since=0)['count'] == 2, (
+            'Убедитесь, что повторно полученный статус не дублируется'
+        )
+
+    def test_backlog(self, tmp_path):
+        history = self.make_history(tmp_path)
+        assert history.backlog() == {'approved': 2, 'reviewing': 2}
+        assert history.backlog('tenant') == {'approved': 2, 'reviewing': 1}
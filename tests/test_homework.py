@@ -0,0 +1,326 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+import requests
+import telegram
+
+from breaker import CircuitBreaker
+from exceptions import (AuthError, QuotaExceeded, RateLimited, ServerError,
+                        TransientNetworkError)
+from quota import QuotaManager
+
+
+class MockResponse:
+
+    def __init__(self, status_code=HTTPStatus.OK, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body if body is not None else {
+            'homeworks': [], 'current_date': 200}
+
+    def json(self):
+        return self.body
+
+
+class MockBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append(text)
+
+
+@pytest.fixture(autouse=True)
+def quota(monkeypatch):
+    import homework
+
+    quota = QuotaManager(rate=1000, burst=1000, max_wait=1)
+    monkeypatch.setattr(homework, 'QUOTA', quota)
+    return quota
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    import homework
+
+    delays = []
+    monkeypatch.setattr(homework, 'SLEEP', delays.append)
+    return delays
+
+
+def mock_responses(monkeypatch, *responses):
+    responses = iter(responses)
+    monkeypatch.setattr(
+        requests, 'get', lambda *args, **kwargs: next(responses))
+
+
+class TestRetryPolicy:
+
+    def test_status_codes_are_classified(self, monkeypatch):
+        import homework
+
+        for status_code, error in (
+            (HTTPStatus.INTERNAL_SERVER_ERROR, ServerError),
+            (HTTPStatus.UNAUTHORIZED, AuthError),
+            (HTTPStatus.TOO_MANY_REQUESTS, RateLimited),
+        ):
+            mock_responses(monkeypatch, MockResponse(status_code))
+            with pytest.raises(error):
+                homework.get_api_answer(100)
+
+    def test_server_error_is_retried(self, monkeypatch, sleeps):
+        import homework
+
+        mock_responses(
+            monkeypatch,
+            MockResponse(HTTPStatus.BAD_GATEWAY),
+            MockResponse(),
+        )
+        assert homework.run_cycle(MockBot(), 100) == 200, (
+            'Убедитесь, что временная ошибка сервера повторяется '
+            'в том же цикле'
+        )
+        assert len(sleeps) == 1
+
+    def test_retry_after_is_honoured(self, monkeypatch, sleeps):
+        import homework
+
+        mock_responses(
+            monkeypatch,
+            MockResponse(HTTPStatus.TOO_MANY_REQUESTS,
+                         headers={'Retry-After': '7'}),
+            MockResponse(),
+        )
+        homework.run_cycle(MockBot(), 100)
+        assert sleeps == [7], (
+            'Убедитесь, что пауза берется из заголовка Retry-After'
+        )
+
+    def test_rate_limit_throttles_quota(self, monkeypatch, sleeps, quota):
+        import homework
+
+        mock_responses(
+            monkeypatch,
+            MockResponse(HTTPStatus.TOO_MANY_REQUESTS,
+                         headers={'Retry-After': '120'}),
+        )
+        homework.run_cycle(MockBot(), 100)
+        assert not sleeps and quota.rate == 500, (
+            'Убедитесь, что ответ 429 снижает лимит запросов'
+        )
+        with pytest.raises(QuotaExceeded):
+            homework.get_api_answer(100)
+
+    def test_open_breaker_alerts_once(self, monkeypatch, sleeps):
+        import homework
+
+        monkeypatch.setattr(homework, 'PRACTICUM_BREAKER', CircuitBreaker(
+            'practicum', (TransientNetworkError, ServerError),
+            failure_threshold=1, recovery_time=300))
+        mock_responses(monkeypatch, *[
+            MockResponse(HTTPStatus.BAD_GATEWAY) for _ in range(3)])
+        bot = MockBot()
+        for _ in range(3):
+            assert homework.run_cycle(bot, 100) == 100
+        assert len(bot.sent) == 1 and 'приостановлены' in bot.sent[0], (
+            'Убедитесь, что о разомкнутой цепи пользователь узнает один раз, '
+            'а не в каждом цикле'
+        )
+
+    def test_auth_error_disables_polling(self, monkeypatch, sleeps):
+        import homework
+
+        mock_responses(monkeypatch, MockResponse(HTTPStatus.UNAUTHORIZED))
+        bot = MockBot()
+        with pytest.raises(AuthError):
+            homework.run_cycle(bot, 100)
+        assert not sleeps and len(bot.sent) == 1, (
+            'Убедитесь, что при отклоненном токене запрос не повторяется, '
+            'а пользователь получает уведомление'
+        )
+
+
+class TestWarmUp:
+
+    def test_ping_does_not_call_api(self, quota):
+        import homework
+
+        class Session:
+
+            def __init__(self):
+                self.requests = []
+
+            def head(self, url, **kwargs):
+                self.requests.append((url, kwargs))
+
+        session = Session()
+        homework.ping(session)
+        [(url, kwargs)] = session.requests
+        assert url == 'https://practicum.yandex.ru/', (
+            'Убедитесь, что прогрев обращается к корню сайта, а не к API'
+        )
+        assert 'headers' not in kwargs and 'params' not in kwargs, (
+            'Убедитесь, что прогрев не передает токен'
+        )
+        assert quota.tokens == quota.burst
+
+
+@pytest.fixture
+def poll_once_env(monkeypatch, tmp_path):
+    import homework
+
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+    monkeypatch.setattr(homework, 'STATE_PATH', str(tmp_path / 'state.json'))
+    monkeypatch.setattr(homework, 'DELIVERED', set())
+    bot = MockBot()
+    monkeypatch.setattr(homework, 'make_bot', lambda: bot)
+    return bot
+
+
+class TestPollOnce:
+
+    def test_cycle_is_checkpointed(self, monkeypatch, poll_once_env):
+        import homework
+
+        homework.save_state({'current_timestamp': 100})
+        mock_responses(monkeypatch, MockResponse())
+        assert homework.poll_once() == homework.EXIT_OK
+        state = homework.load_state()
+        assert state['current_timestamp'] == 200, (
+            'Убедитесь, что после цикла сохраняется метка времени из ответа'
+        )
+        assert homework.poll_once() == homework.EXIT_OK, (
+            'Убедитесь, что до наступления времени опроса запрос не делается'
+        )
+
+    def test_failed_cycle_exit_code(self, monkeypatch, poll_once_env, sleeps):
+        import homework
+
+        mock_responses(monkeypatch, MockResponse(body={'homeworks': {}}))
+        assert homework.poll_once() == homework.EXIT_FAILED
+        assert len(poll_once_env.sent) == 1
+
+    def test_auth_error_disables_tenant(self, monkeypatch, poll_once_env):
+        import homework
+
+        mock_responses(monkeypatch, MockResponse(HTTPStatus.FORBIDDEN))
+        assert homework.poll_once() == homework.EXIT_DISABLED
+        homework.save_state({**homework.load_state(), 'next_poll': 0})
+        assert homework.poll_once() == homework.EXIT_DISABLED, (
+            'Убедитесь, что отключенный токен больше не опрашивается'
+        )
+
+    def test_telegram_auth_error_keeps_polling(
+            self, monkeypatch, poll_once_env):
+        import homework
+
+        def reject(**kwargs):
+            raise telegram.error.Unauthorized('Unauthorized')
+
+        monkeypatch.setattr(poll_once_env, 'send_message', reject)
+        mock_responses(monkeypatch, MockResponse(body={
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 200,
+        }))
+        assert homework.poll_once() == homework.EXIT_FAILED
+        assert 'disabled' not in homework.load_state(), (
+            'Убедитесь, что отклоненный токен бота не отключает опрос '
+            'по действительному токену Яндекс практикума'
+        )
+
+
+class TestDelivery:
+
+    def test_failed_send_does_not_repeat_delivered(self, monkeypatch,
+                                                   sleeps):
+        import homework
+
+        monkeypatch.setattr(homework, 'DELIVERED', set())
+        body = {
+            'homeworks': [
+                {'homework_name': 'new', 'status': 'approved'},
+                {'homework_name': 'old', 'status': 'reviewing'},
+            ],
+            'current_date': 200,
+        }
+        mock_responses(
+            monkeypatch, MockResponse(body=body), MockResponse(body=body))
+        bot = MockBot()
+        send = bot.send_message
+
+        def flaky(text=None, **kwargs):
+            if '"new"' in text and not hasattr(bot, 'failed'):
+                bot.failed = True
+                raise telegram.error.BadRequest('Bad Request')
+            send(text=text, **kwargs)
+
+        monkeypatch.setattr(bot, 'send_message', flaky)
+        assert homework.run_cycle(bot, 100) == 100
+        assert homework.run_cycle(bot, 100) == 200
+        delivered = [text for text in bot.sent if 'Сбой' not in text]
+        assert len(delivered) == 2, (
+            'Убедитесь, что после ошибки отправки одного уведомления '
+            'остальные не отправляются повторно'
+        )
+        assert not homework.DELIVERED
+
+
+class TestHistory:
+
+    def test_history_error_does_not_block_notifications(self, monkeypatch):
+        import homework
+
+        class BrokenHistory:
+
+            def append(self, tenant, homeworks):
+                raise sqlite3.OperationalError('database is locked')
+
+        monkeypatch.setattr(homework, 'HISTORY', BrokenHistory())
+        monkeypatch.setattr(homework, 'DELIVERED', set())
+        mock_responses(monkeypatch, MockResponse(body={
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 200,
+        }))
+        bot = MockBot()
+        assert homework.run_cycle(bot, 100) == 200
+        assert len(bot.sent) == 1, (
+            'Убедитесь, что ошибка базы истории не мешает уведомлениям'
+        )
+
+
+class TestValidation:
+
+    def test_validator_reports_every_problem(self):
+        import homework
+
+        errors = homework.validate_homework({'status': 'unknown'})
+        assert len(errors) == 2, (
+            'Убедитесь, что проверка находит все ошибки записи за один проход'
+        )
+        assert homework.validate_homework(
+            {'homework_name': 'hw', 'status': 'approved'}) == []
+
+    def test_bad_homework_does_not_block_batch(self, monkeypatch):
+        import homework
+        import metrics
+
+        quarantined = metrics.COUNTERS['quarantined_homeworks']
+        mock_responses(monkeypatch, MockResponse(body={
+            'homeworks': [
+                {'homework_name': 'hw2', 'status': 'unknown'},
+                'не словарь',
+                {'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': 200,
+        }))
+        bot = MockBot()
+        assert homework.run_cycle(bot, 100) == 200
+        assert len(bot.sent) == 1 and '"hw1"' in bot.sent[0], (
+            'Убедитесь, что корректные работы обрабатываются, даже если '
+            'в ответе есть некорректные'
+        )
+        assert metrics.COUNTERS['quarantined_homeworks'] == quarantined + 2
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import metrics
+from exceptions import QuotaExceeded
+from quota import QuotaManager
+
+
+class TestQuotaManager:
+
+    def test_rate_is_enforced(self):
+        quota = QuotaManager(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(4):
+            quota.acquire()
+        assert time.monotonic() - started >= 0.05, (
+            'Убедитесь, что запросы не превышают заданную скорость'
+        )
+
+    def test_requests_are_shed(self):
+        quota = QuotaManager(rate=1, burst=1, max_wait=0.01)
+        shed = metrics.COUNTERS['quota_shed']
+        quota.acquire()
+        with pytest.raises(QuotaExceeded):
+            quota.acquire()
+        assert metrics.COUNTERS['quota_shed'] == shed + 1
+
+    def test_throttle_and_recover(self):
+        quota = QuotaManager(rate=10, burst=10, max_wait=0.01)
+        quota.throttle(retry_after=60)
+        assert quota.rate == 5
+        with pytest.raises(QuotaExceeded):
+            quota.acquire()
+        for _ in range(10):
+            quota.recover()
+        assert quota.rate == 10
+
+    def test_unlimited(self):
+        quota = QuotaManager()
+        quota.throttle(60)
+        quota.acquire()
+
+    def test_slots_are_spread(self):
+        interval = 600
+        offsets = {
+            (QuotaManager.until_slot(str(key), interval, now=0)) % interval
+            for key in range(100)
+        }
+        assert len(offsets) > 80, (
+            'Убедитесь, что слоты опроса распределены по интервалу'
+        )
+        for key in range(10):
+            delay = QuotaManager.until_slot(str(key), interval, now=12345)
+            assert interval / 2 <= delay < interval * 1.5
+
+    def test_bucket_is_shared_between_processes(self, tmp_path):
+        path = tmp_path / 'quota.sqlite3'
+        first = QuotaManager(rate=1, burst=2, max_wait=0.01, path=path)
+        second = QuotaManager(rate=1, burst=2, max_wait=0.01, path=path)
+        first.acquire()
+        first.acquire()
+        with pytest.raises(QuotaExceeded):
+            second.acquire()
+        assert not second.try_acquire(), (
+            'Убедитесь, что корзина из файла общая для всех процессов'
+        )
+        first.throttle(retry_after=60)
+        second.recover()
+        assert second.rate == 0.6, (
+            'Убедитесь, что снижение скорости видно другим процессам'
+        )
@@ -0,0 +1,71 @@
+import io
+import json
+import logging
+
+from structured_logging import (HIDDEN, JsonFormatter, RedactingFilter,
+                                SamplingFilter, redact)
+
+
+def make_logger(name, *filters, level=logging.DEBUG):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.filters = list(filters)
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger, stream
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestStructuredLogging:
+
+    def test_redact(self):
+        headers = {'Authorization': 'OAuth secret', 'Accept': 'json'}
+        assert redact({'headers': headers, 'params': [headers]}) == {
+            'headers': {'Authorization': HIDDEN, 'Accept': 'json'},
+            'params': [{'Authorization': HIDDEN, 'Accept': 'json'}],
+        }
+
+    def test_json_lines_are_redacted(self):
+        logger, stream = make_logger('test.json', RedactingFilter())
+        logger.info('Заголовки %s', {'Authorization': 'OAuth secret'},
+                    extra={'event': 'request', 'token': 'secret'})
+        entry, = lines(stream)
+        assert 'secret' not in stream.getvalue(), (
+            'Убедитесь, что секретные поля скрываются в логах'
+        )
+        assert entry['event'] == 'request' and entry['level'] == 'INFO'
+
+    def test_formatting_is_lazy(self):
+        logger, stream = make_logger('test.lazy', level=logging.INFO)
+        calls = []
+
+        class Message:
+            def __str__(self):
+                calls.append(1)
+                return 'сообщение'
+
+        logger.debug('Отладка %s', Message())
+        assert not calls and not stream.getvalue(), (
+            'Убедитесь, что отключенные сообщения не форматируются'
+        )
+
+    def test_sampling_per_tenant(self):
+        logger, stream = make_logger(
+            'test.sampling', SamplingFilter(3, events=('message_sent',)))
+        for _ in range(6):
+            for tenant in ('a', 'b'):
+                logger.info('Отправлено', extra={
+                    'event': 'message_sent', 'tenant': tenant})
+        logger.info('Не выбирается')
+        logger.error('Ошибка')
+        entries = lines(stream)
+        assert len(entries) == 6, (
+            'Убедитесь, что повторяющиеся события выбираются '
+            'отдельно для каждого токена'
+        )
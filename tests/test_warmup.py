@@ -0,0 +1,98 @@
+import socket
+
+import pytest
+
+import warmup
+from warmup import DnsCache, Warmer, host_of
+
+
+class TestDnsCache:
+
+    def make_cache(self, ttl=300):
+        cache = DnsCache(['practicum.yandex.ru'], ttl=ttl)
+        calls = []
+
+        def resolve(host, port, *args, **kwargs):
+            calls.append(host)
+            if cache.fail:
+                raise socket.gaierror('нет сети')
+            return [(host, port)]
+
+        cache.fail = False
+        cache._getaddrinfo = resolve
+        return cache, calls
+
+    def test_cached_within_ttl(self):
+        cache, calls = self.make_cache()
+        cache.getaddrinfo('practicum.yandex.ru', 443)
+        cache.getaddrinfo('practicum.yandex.ru', 443)
+        assert calls == ['practicum.yandex.ru'], (
+            'Убедитесь, что имя разрешается один раз за время жизни записи'
+        )
+
+    def test_other_hosts_are_not_cached(self):
+        cache, calls = self.make_cache()
+        cache.getaddrinfo('example.com', 443)
+        cache.getaddrinfo('example.com', 443)
+        assert len(calls) == 2
+
+    def test_stale_entry_on_failure(self):
+        cache, calls = self.make_cache(ttl=0)
+        result = cache.getaddrinfo('practicum.yandex.ru', 443)
+        cache.fail = True
+        assert cache.getaddrinfo('practicum.yandex.ru', 443) == result, (
+            'Убедитесь, что при ошибке разрешения используется старая запись'
+        )
+        with pytest.raises(socket.gaierror):
+            cache.getaddrinfo('practicum.yandex.ru', 80)
+
+    def test_host_of(self):
+        assert host_of('https://api.telegram.org/') == 'api.telegram.org'
+
+
+class TestWarmer:
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = [0]
+        monkeypatch.setattr(warmup.time, 'monotonic', lambda: clock[0])
+        return clock
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch, clock):
+        delays = []
+
+        def sleep(delay):
+            delays.append(delay)
+            clock[0] += delay
+
+        monkeypatch.setattr(warmup.time, 'sleep', sleep)
+        return delays
+
+    def test_fresh_connections_are_kept(self, sleeps):
+        calls = []
+        warmer = Warmer({'api': lambda: calls.append(1)}, keepalive=60)
+        warmer.wait(30, last_used=0)
+        assert sleeps == [30] and not calls, (
+            'Убедитесь, что соединения не обновляются, '
+            'если они не успеют закрыться до опроса'
+        )
+
+    def test_idle_connections_are_refreshed_before_poll(self, sleeps):
+        calls = []
+        warmer = Warmer(
+            {'api': lambda: calls.append(1)}, keepalive=60, lead=5)
+        warmer.wait(600, last_used=0)
+        assert sleeps == [595, 5] and calls == [1], (
+            'Убедитесь, что соединения обновляются один раз перед опросом'
+        )
+
+    def test_slow_warm_up_does_not_delay_poll(self, clock, sleeps):
+
+        def slow():
+            clock[0] += 4
+
+        Warmer({'api': slow}, keepalive=60, lead=5).wait(600, last_used=0)
+        assert sleeps == [595, 1], (
+            'Убедитесь, что время прогрева вычитается из паузы до опроса'
+        )
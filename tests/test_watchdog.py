@@ -0,0 +1,67 @@
+import json
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import metrics
+from watchdog import Watchdog, serve
+
+
+class TestWatchdog:
+
+    def test_stalled_task_is_detected(self):
+        watchdog = Watchdog(deadline=0.01, period=60)
+        stalls = metrics.COUNTERS['watchdog_stalls']
+        with watchdog.task('practicum'):
+            time.sleep(0.02)
+            assert list(watchdog.check()) == ['practicum'], (
+                'Убедитесь, что зависшая задача обнаруживается'
+            )
+            assert not watchdog.check(), (
+                'Зависшая задача должна учитываться один раз'
+            )
+            assert not watchdog.status()['alive']
+        assert metrics.COUNTERS['watchdog_stalls'] == stalls + 1
+        assert watchdog.status()['alive']
+
+    def test_finished_task_is_not_stalled(self):
+        watchdog = Watchdog(deadline=0.01, period=60)
+        with watchdog.task('cycle'):
+            pass
+        time.sleep(0.02)
+        assert not watchdog.check()
+        assert watchdog.lag() == 0
+
+    def test_missed_heartbeat_is_stall(self):
+        watchdog = Watchdog(deadline=0.01, period=0)
+        stalls = metrics.COUNTERS['watchdog_stalls']
+        time.sleep(0.02)
+        assert list(watchdog.check()) == ['cycle'], (
+            'Убедитесь, что зависание между циклами обнаруживается'
+        )
+        assert not watchdog.check()
+        assert metrics.COUNTERS['watchdog_stalls'] == stalls + 1
+        with watchdog.task('cycle'):
+            pass
+        assert watchdog.status()['alive']
+
+    def test_health_endpoint(self):
+        watchdog = Watchdog(deadline=0.01, period=0)
+        server = serve(watchdog, 0)
+        url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+        try:
+            with urlopen(url + 'healthz') as response:
+                assert json.load(response)['alive']
+            time.sleep(0.02)
+            try:
+                urlopen(url + 'readyz')
+            except HTTPError as error:
+                assert error.code == 503
+                assert json.load(error)['loop_lag'] > 0
+            else:
+                assert False, (
+                    'Убедитесь, что при отставании цикла проверка '
+                    'готовности не проходит'
+                )
+        finally:
+            server.shutdown()
@@ -0,0 +1,131 @@
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+WARM_UP_ERROR = 'Не удалось прогреть соединение %s: %s'
+
+
+class DnsCache:
+    """Кеширует результаты разрешения имен выбранных хостов на `ttl` секунд.
+
+    Если повторное разрешение не удалось, используется устаревшая запись.
+    """
+
+    def __init__(self, hosts, ttl=300):
+        self.hosts = set(hosts)
+        self.ttl = ttl
+        self.entries = {}
+        self._getaddrinfo = socket.getaddrinfo
+        self._lock = threading.Lock()
+
+    def getaddrinfo(self, host, port, *args, **kwargs):
+        """Замена socket.getaddrinfo с кешированием."""
+        if host not in self.hosts:
+            return self._getaddrinfo(host, port, *args, **kwargs)
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            expires, result = self.entries.get(key, (0, None))
+        if expires > time.monotonic():
+            return result
+        try:
+            result = self._getaddrinfo(host, port, *args, **kwargs)
+        except OSError:
+            if result is None:
+                raise
+            return result
+        with self._lock:
+            self.entries[key] = (time.monotonic() + self.ttl, result)
+        return result
+
+    def refresh(self):
+        """Заново разрешает имена хостов с истекшими записями."""
+        for host in self.hosts:
+            self.getaddrinfo(host, 443, 0, socket.SOCK_STREAM)
+
+    def install(self):
+        """Подключает кеш ко всем соединениям процесса."""
+        socket.getaddrinfo = self.getaddrinfo
+
+
+def make_session(connections):
+    """Создает сессию с пулом из `connections` соединений на хост."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=connections)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def open_connections(request, connections):
+    """Открывает в пуле `connections` соединений параллельными запросами."""
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        for future in [
+            executor.submit(request) for _ in range(connections)
+        ]:
+            future.result()
+
+
+def host_of(url):
+    """Имя хоста из URL."""
+    return urlsplit(url).hostname
+
+
+def origin_of(url):
+    """Корень сайта из URL."""
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}/'
+
+
+class Warmer:
+    """Заранее открывает соединения с API и обновляет их перед опросом.
+
+    Метод `warm` обновляет кеш DNS и вызывает функции из словаря
+    `targets`, каждая из которых делает легкий запрос к сервису. Между
+    опросами соединения обновляются, только если иначе они закроются
+    по таймауту простоя `keepalive`: за `lead` секунд до опроса.
+    """
+
+    def __init__(self, targets, dns_cache=None, keepalive=60, lead=5,
+                 logger=None):
+        self.targets = targets
+        self.dns_cache = dns_cache
+        self.keepalive = keepalive
+        self.lead = lead
+        self.logger = logger or logging.getLogger(__name__)
+
+    def warm(self):
+        """Прогревает DNS и соединения один раз."""
+        started = time.monotonic()
+        if self.dns_cache:
+            try:
+                self.dns_cache.refresh()
+            except OSError as error:
+                self.logger.warning(WARM_UP_ERROR, 'DNS', error)
+        for name, target in self.targets.items():
+            try:
+                target()
+            except Exception as error:
+                self.logger.warning(WARM_UP_ERROR, name, error)
+        metrics.record('warm_up_time', time.monotonic() - started)
+
+    def wait(self, delay, last_used=None):
+        """Ждет `delay` секунд до опроса, при необходимости обновляя пулы.
+
+        `last_used` - время последнего запроса по часам time.monotonic.
+        """
+        now = time.monotonic()
+        deadline = now + delay
+        idle = deadline - (now if last_used is None else last_used)
+        if idle > self.keepalive and delay > self.lead:
+            time.sleep(delay - self.lead)
+            self.warm()
+            delay = max(0, deadline - time.monotonic())
+        time.sleep(delay)
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+
+STALL_EXIT_CODE = 70
+STALLED = 'Задача %s не завершилась за %.0f с.'
+HEARTBEAT_MISSED = 'Задача %s не начиналась заново %.0f с. сверх периода.'
+THREAD_STACK = 'Стек потока %s:\n%s'
+
+
+class Watchdog(threading.Thread):
+    """Следит, чтобы циклы опроса и запросы к API не зависали.
+
+    Задачи отмечаются контекстным менеджером `task`. Если задача
+    выполняется дольше `deadline` секунд или цикл опроса опаздывает
+    относительно периода больше чем на `deadline` секунд, в лог выводятся
+    стеки всех потоков, увеличивается счетчик `watchdog_stalls`, а при
+    `exit_on_stall` процесс завершается, чтобы его перезапустил супервизор.
+    """
+
+    def __init__(self, deadline, period, exit_on_stall=False, interval=None,
+                 logger=None):
+        super().__init__(name='watchdog', daemon=True)
+        self.deadline = deadline
+        self.period = period
+        self.exit_on_stall = exit_on_stall
+        self.interval = interval or min(deadline / 4, 5)
+        self.logger = logger or logging.getLogger(__name__)
+        self.started = time.monotonic()
+        self.active = {}
+        self.finished = {}
+        self.stalled = set()
+        self._lock = threading.Lock()
+        metrics.gauge('loop_lag', self.lag)
+
+    @contextmanager
+    def task(self, name):
+        """Отмечает начало и конец задачи."""
+        with self._lock:
+            self.active[name] = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active.pop(name, None)
+                self.finished[name] = time.monotonic()
+                self.stalled.discard(name)
+
+    def lag(self, name='cycle'):
+        """На сколько секунд задача опаздывает относительно периода опроса."""
+        last = self.finished.get(name, self.started)
+        return max(0.0, time.monotonic() - last - self.period)
+
+    def check(self, heartbeat='cycle'):
+        """Находит зависшие задачи и пропущенные циклы и реагирует на них."""
+        now = time.monotonic()
+        with self._lock:
+            stalled = {
+                name: now - started for name, started in self.active.items()
+                if now - started > self.deadline and name not in self.stalled
+            }
+            lag = self.lag(heartbeat)
+            missed = (lag > self.deadline and heartbeat not in self.active
+                      and heartbeat not in self.stalled)
+            if missed:
+                stalled[heartbeat] = lag
+            self.stalled.update(stalled)
+        for name, duration in stalled.items():
+            if missed and name == heartbeat:
+                self.logger.critical(HEARTBEAT_MISSED, name, duration)
+            else:
+                self.logger.critical(STALLED, name, duration)
+            metrics.increment('watchdog_stalls')
+        if stalled:
+            self.dump_stacks()
+            if self.exit_on_stall:
+                os._exit(STALL_EXIT_CODE)
+        return stalled
+
+    def dump_stacks(self):
+        """Выводит в лог стеки всех потоков."""
+        frames = sys._current_frames()
+        for thread in threading.enumerate():
+            frame = frames.get(thread.ident)
+            if frame is not None:
+                self.logger.critical(
+                    THREAD_STACK, thread.name,
+                    ''.join(traceback.format_stack(frame)))
+
+    def status(self):
+        """Состояние задач для проверок живости и готовности."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'alive': not self.stalled,
+                'ready': self.lag() <= self.deadline,
+                'loop_lag': round(self.lag(), 3),
+                'active': {
+                    name: round(now - started, 3)
+                    for name, started in self.active.items()
+                },
+                'stalled': sorted(self.stalled),
+            }
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Отвечает на проверки живости, готовности и запрос метрик."""
+
+    watchdog = None
+
+    def do_GET(self):
+        status = self.watchdog.status()
+        if self.path == '/healthz':
+            self.reply(status['alive'], status)
+        elif self.path == '/readyz':
+            self.reply(status['ready'], status)
+        elif self.path == '/metrics':
+            self.reply(True, metrics.snapshot())
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def reply(self, ok, body):
+        data = json.dumps(body).encode()
+        self.send_response(
+            HTTPStatus.OK if ok else HTTPStatus.SERVICE_UNAVAILABLE)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(watchdog, port):
+    """Запускает HTTP-сервер проверок в отдельном потоке."""
+    handler = type('Handler', (HealthHandler,), {'watchdog': watchdog})
+    server = ThreadingHTTPServer(('', port), handler)
+    threading.Thread(
+        target=server.serve_forever, name='health', daemon=True).start()
+    return server